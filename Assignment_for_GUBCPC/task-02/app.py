@@ -1,9 +1,22 @@
-from flask import Flask, request, jsonify
-from datetime import datetime
+from flask import Flask, request, jsonify, g, has_request_context
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import bisect
+import cProfile
+import gzip
+import hashlib
+import hmac
+import itertools
 import json
 import os
+import pstats
+import random
+import re
 import redis
 import logging
+import logging.handlers
+import threading
+import time
 
 app = Flask(__name__)
 
@@ -11,35 +24,309 @@ app = Flask(__name__)
 # In production, you would use a proper database
 solved_problems = []
 
+# Guards changes to solved_problems together with the save_data() that follows,
+# so archiving cannot drop a record appended while the hot list is rebuilt
+data_lock = threading.Lock()
+
 # File-based persistence (optional)
 DATA_FILE = 'solved_problems.json'
 
+# Cold storage: records older than ARCHIVE_AFTER_DAYS move out of memory into
+# immutable, gzip-compressed monthly segments in ARCHIVE_DIR (0 disables archiving)
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 90))
+# Seconds between archive runs triggered by POST /solve
+ARCHIVE_INTERVAL = float(os.getenv('ARCHIVE_INTERVAL', 3600))
+
+# time.monotonic() of the last archive run, None until the first one
+last_archive_run = None
+
+# Per-user indexes of the cold segments, loaded at startup (records stay on disk)
+cold_segments = []
+
+# Highest problem id across hot and cold records, so new ids are O(1)
+last_problem_id = 0
+
 # Redis configuration
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 REDIS_DB = int(os.getenv('REDIS_DB', 0))
 CACHE_TTL = int(os.getenv('CACHE_TTL', 3600))  # 1 hour default
 
-# Initialize Redis connection
-try:
-    redis_client = redis.Redis(
-        host=REDIS_HOST,
-        port=REDIS_PORT,
+# Comma-separated list of "host:port" cache nodes; falls back to REDIS_HOST/REDIS_PORT
+REDIS_NODES = [
+    node.strip()
+    for node in os.getenv('REDIS_NODES', f'{REDIS_HOST}:{REDIS_PORT}').split(',')
+    if node.strip()
+]
+# Points placed on the hash ring per node, evens out the key distribution
+REDIS_VIRTUAL_NODES = int(os.getenv('REDIS_VIRTUAL_NODES', 160))
+# Seconds a node that failed to connect is skipped before it is tried again
+REDIS_RETRY_AFTER = float(os.getenv('REDIS_RETRY_AFTER', 30))
+
+class HashRing:
+    """
+    Consistent hash ring mapping user ids to cache nodes.
+    Adding or removing a node only remaps the keys owned by that node.
+    """
+
+    def __init__(self, virtual_nodes=REDIS_VIRTUAL_NODES):
+        # Without points on the ring no key could ever be mapped to a node
+        if virtual_nodes < 1:
+            raise ValueError(f"REDIS_VIRTUAL_NODES must be at least 1, got {virtual_nodes}")
+        self.virtual_nodes = virtual_nodes
+        self.nodes = {}
+        self._ring = []
+        self._owners = {}
+
+    @staticmethod
+    def _hash(value):
+        return int(hashlib.md5(value.encode('utf-8')).hexdigest()[:16], 16)
+
+    def add_node(self, name, client):
+        """Place a node and its virtual nodes on the ring"""
+        if name in self.nodes:
+            return
+        self.nodes[name] = client
+        for i in range(self.virtual_nodes):
+            point = self._hash(f"{name}#{i}")
+            # Skip the (unlikely) collision instead of stealing another node's point
+            if point in self._owners:
+                continue
+            self._owners[point] = name
+            bisect.insort(self._ring, point)
+
+    def remove_node(self, name):
+        """Take a node and its virtual nodes off the ring"""
+        if self.nodes.pop(name, None) is None:
+            return
+        self._ring = [point for point in self._ring if self._owners[point] != name]
+        self._owners = {point: self._owners[point] for point in self._ring}
+
+    def get_node_name(self, key):
+        """Return the name of the node owning key, or None if the ring is empty"""
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._ring, self._hash(str(key))) % len(self._ring)
+        return self._owners[self._ring[index]]
+
+    def get_node(self, key):
+        """Return the client of the node owning key, or None if the ring is empty"""
+        name = self.get_node_name(key)
+        return self.nodes[name] if name is not None else None
+
+    def __len__(self):
+        return len(self.nodes)
+
+def parse_redis_node(node):
+    """Split a "host:port" node string, defaulting to REDIS_PORT"""
+    host, _, port = node.rpartition(':')
+    if not host:
+        return port, REDIS_PORT
+    return host, int(port)
+
+# Nodes that failed to connect, mapped to the time.monotonic() they may be retried
+node_down_until = {}
+
+def refresh_redis_available():
+    """Recompute REDIS_AVAILABLE from the nodes that are not backing off"""
+    global REDIS_AVAILABLE
+    now = time.monotonic()
+    REDIS_AVAILABLE = any(node_down_until.get(name, 0) <= now for name in cache_ring.nodes)
+    return REDIS_AVAILABLE
+
+def mark_node_down(name, error):
+    """Skip a node for REDIS_RETRY_AFTER seconds after a connection failure"""
+    node_down_until[name] = time.monotonic() + REDIS_RETRY_AFTER
+    print(f"⚠️  Redis node {name} not available, retrying in {REDIS_RETRY_AFTER:g}s: {error}")
+    refresh_redis_available()
+
+def handle_node_error(user_id, error):
+    """Mark the user's node down if the error means it could not be reached"""
+    if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+        mark_node_down(cache_ring.get_node_name(user_id), error)
+
+def get_node_client(name):
+    """Get a node's client, or None while the node is backing off"""
+    down_until = node_down_until.get(name)
+    if down_until is None:
+        return cache_ring.nodes[name]
+    if time.monotonic() < down_until:
+        return None
+    
+    # Backoff is over, check the node once before sending it traffic again
+    client = cache_ring.nodes[name]
+    try:
+        client.ping()
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        mark_node_down(name, e)
+        return None
+    node_down_until.pop(name, None)
+    refresh_redis_available()
+    print(f"✅ Redis connection re-established ({name})")
+    return client
+
+# Initialize Redis connections. Every configured node joins the ring so all
+# app instances agree on where a user's cache lives; an unreachable node is
+# skipped for REDIS_RETRY_AFTER seconds, so its users just miss the cache.
+cache_ring = HashRing()
+for node in REDIS_NODES:
+    try:
+        host, port = parse_redis_node(node)
+    except ValueError as e:
+        print(f"⚠️  Invalid Redis node {node}: {e}")
+        continue
+    
+    client = redis.Redis(
+        host=host,
+        port=port,
         db=REDIS_DB,
         decode_responses=True,
         socket_connect_timeout=5,
         socket_timeout=5
     )
-    # Test connection
-    redis_client.ping()
-    REDIS_AVAILABLE = True
-    print("✅ Redis connection established")
-except (redis.ConnectionError, redis.TimeoutError) as e:
-    redis_client = None
-    REDIS_AVAILABLE = False
-    print(f"⚠️  Redis not available: {e}")
+    cache_ring.add_node(node, client)
+    try:
+        # Test connection
+        client.ping()
+        print(f"✅ Redis connection established ({node})")
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        mark_node_down(node, e)
+
+if not refresh_redis_available():
     print("📝 API will work without caching")
 
+# Request instrumentation (opt-in), adjustable at runtime through /admin/profiling
+profiling_config = {
+    # Per-phase timers and the slow-request log
+    'timing_enabled': os.getenv('REQUEST_TIMING', 'false').lower() in ('1', 'true', 'yes'),
+    # cProfile on a sample of the timed requests
+    'profiler_enabled': os.getenv('PROFILER_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
+    'sample_rate': float(os.getenv('PROFILE_SAMPLE_RATE', 0.01)),
+    'slow_request_ms': float(os.getenv('SLOW_REQUEST_MS', 500))
+}
+SLOW_REQUEST_LOG = os.getenv('SLOW_REQUEST_LOG', 'slow_requests.log')
+# The slow-request log rotates so it cannot grow without bound
+SLOW_REQUEST_LOG_MAX_BYTES = int(os.getenv('SLOW_REQUEST_LOG_MAX_BYTES', 10 * 1024 * 1024))
+SLOW_REQUEST_LOG_BACKUPS = int(os.getenv('SLOW_REQUEST_LOG_BACKUPS', 5))
+PROFILE_TOP_FUNCTIONS = int(os.getenv('PROFILE_TOP_FUNCTIONS', 15))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+def check_admin_token():
+    """Return an error response unless the request carries ADMIN_TOKEN"""
+    if not ADMIN_TOKEN:
+        return jsonify({
+            'error': 'Admin endpoints are disabled, set ADMIN_TOKEN to enable them'
+        }), 403
+    token = request.headers.get('X-Admin-Token', '').encode('utf-8')
+    if not hmac.compare_digest(token, ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({
+            'error': 'Invalid or missing admin token'
+        }), 403
+    return None
+
+# At most one request is profiled at a time, which bounds the sampling overhead
+profiler_lock = threading.Lock()
+
+slow_request_logger = logging.getLogger('slow_requests')
+slow_request_logger.setLevel(logging.INFO)
+slow_request_logger.propagate = False
+if SLOW_REQUEST_LOG:
+    slow_request_logger.addHandler(logging.handlers.RotatingFileHandler(
+        SLOW_REQUEST_LOG,
+        maxBytes=SLOW_REQUEST_LOG_MAX_BYTES,
+        backupCount=SLOW_REQUEST_LOG_BACKUPS,
+        delay=True
+    ))
+
+@contextmanager
+def timed_phase(name):
+    """Add the time spent in the block to the current request's phase breakdown"""
+    if not has_request_context() or g.get('phase_timings') is None:
+        yield
+        return
+    
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        g.phase_timings[name] = g.phase_timings.get(name, 0) + elapsed
+
+def summarize_profile(profiler):
+    """Get the functions with the highest cumulative time from a profiler run"""
+    stats = pstats.Stats(profiler).stats
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            'function': f"{os.path.basename(file_name)}:{line}({function})",
+            'calls': calls,
+            'total_ms': round(total_time * 1000, 3),
+            'cumulative_ms': round(cumulative_time * 1000, 3)
+        }
+        for (file_name, line, function), (_, calls, total_time, cumulative_time, _)
+        in top[:PROFILE_TOP_FUNCTIONS]
+    ]
+
+def stop_profiler():
+    """Stop the current request's profiler, if any, and release the profiler slot"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        profiler_lock.release()
+    return profiler
+
+@app.before_request
+def start_request_timing():
+    """Start phase timing, and profiling for sampled requests"""
+    if not profiling_config['timing_enabled']:
+        return
+    
+    g.request_start = time.perf_counter()
+    g.phase_timings = {}
+    
+    if (profiling_config['profiler_enabled']
+            and random.random() < profiling_config['sample_rate']
+            and profiler_lock.acquire(blocking=False)):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_request_timing(response):
+    """Write a slow-request log entry with the phase breakdown"""
+    if g.get('phase_timings') is None:
+        return response
+    
+    profiler = stop_profiler()
+    duration = (time.perf_counter() - g.request_start) * 1000
+    phases = {name: round(elapsed, 3) for name, elapsed in g.phase_timings.items()}
+    
+    response.headers['Server-Timing'] = ', '.join(
+        [f'{name};dur={elapsed}' for name, elapsed in phases.items()]
+        + [f'total;dur={round(duration, 3)}']
+    )
+    
+    if duration >= profiling_config['slow_request_ms']:
+        entry = {
+            'timestamp': datetime.now().isoformat(),
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'duration_ms': round(duration, 3),
+            'phases': phases,
+            'unaccounted_ms': round(duration - sum(phases.values()), 3)
+        }
+        if profiler is not None:
+            entry['profile'] = summarize_profile(profiler)
+        slow_request_logger.info(json.dumps(entry))
+    
+    return response
+
+@app.teardown_request
+def release_request_profiler(exception=None):
+    """Make sure the profiler slot is released even if the request failed"""
+    stop_profiler()
+
 def load_data():
     """Load data from file if it exists"""
     global solved_problems
@@ -49,61 +336,265 @@ def load_data():
                 solved_problems = json.load(f)
         except (json.JSONDecodeError, FileNotFoundError):
             solved_problems = []
+    refresh_last_problem_id()
 
 def save_data():
     """Save data to file"""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(solved_problems, f, indent=2)
+    with timed_phase('persistence'):
+        with open(DATA_FILE, 'w') as f:
+            json.dump(solved_problems, f, indent=2)
+
+def load_cold_segments():
+    """Load the index of every cold segment in ARCHIVE_DIR"""
+    global cold_segments
+    cold_segments = []
+    if not os.path.isdir(ARCHIVE_DIR):
+        return
+    for name in sorted(os.listdir(ARCHIVE_DIR)):
+        if not name.endswith('.index.json'):
+            continue
+        try:
+            with open(os.path.join(ARCHIVE_DIR, name), 'r') as f:
+                cold_segments.append(json.load(f))
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Segment index read error ({name}): {e}")
+    refresh_last_problem_id()
+
+def write_segment(partition, records):
+    """Write records as a new immutable compressed segment plus its per-user index"""
+    # Number from the files on disk, not the loaded indexes, so a segment whose
+    # index could not be read is never overwritten
+    pattern = re.compile(rf"solves-{re.escape(partition)}-(\d{{4}})\.")
+    existing = os.listdir(ARCHIVE_DIR) if os.path.isdir(ARCHIVE_DIR) else []
+    sequence = max(
+        (int(match.group(1)) for match in map(pattern.match, existing) if match),
+        default=0
+    ) + 1
+    name = f"solves-{partition}-{sequence:04d}"
+    # Grouped by user so one user's records are a single contiguous block
+    records = sorted(records, key=lambda x: (str(x['user_id']), x['solved_at']))
+    
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    file_name = f"{name}.jsonl.gz"
+    segment_path = os.path.join(ARCHIVE_DIR, file_name)
+    users = {}
+    # Write to temp files first so a crash never leaves a half-written segment
+    with open(segment_path + '.tmp', 'wb') as f:
+        start = 0
+        for user_id, group in itertools.groupby(records, key=lambda x: str(x['user_id'])):
+            group = list(group)
+            # Each user is its own gzip member, so reading one user seeks to its
+            # block and never decompresses the rest of the month
+            block = gzip.compress(
+                ''.join(json.dumps(problem) + '\n' for problem in group).encode('utf-8')
+            )
+            entry = {
+                'range': [start, len(group)],
+                'offset': f.tell(),
+                'length': len(block),
+                'min_solved_at': group[0]['solved_at'],
+                'max_solved_at': group[-1]['solved_at'],
+                'difficulty': {},
+                'platform': {}
+            }
+            for problem in group:
+                difficulty = problem.get('difficulty', 'Unknown')
+                platform = problem.get('platform', 'Unknown')
+                entry['difficulty'][difficulty] = entry['difficulty'].get(difficulty, 0) + 1
+                entry['platform'][platform] = entry['platform'].get(platform, 0) + 1
+            users[user_id] = entry
+            f.write(block)
+            start += len(group)
+    os.replace(segment_path + '.tmp', segment_path)
+    
+    index = {
+        'file': file_name,
+        'partition': partition,
+        'count': len(records),
+        'max_id': max(problem['id'] for problem in records),
+        'min_solved_at': min(problem['solved_at'] for problem in records),
+        'max_solved_at': max(problem['solved_at'] for problem in records),
+        'users': users
+    }
+    
+    index_path = os.path.join(ARCHIVE_DIR, f"{name}.index.json")
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump(index, f)
+    os.replace(index_path + '.tmp', index_path)
+    
+    cold_segments.append(index)
+    refresh_last_problem_id(index['max_id'])
+    return index
+
+def drop_archived_problems():
+    """
+    Drop hot records that are already in a cold segment, which happens when the
+    app stopped after writing segments but before saving the smaller hot file
+    """
+    global solved_problems
+    archived_ids = {}
+    for segment in cold_segments:
+        partition = segment['partition']
+        archived_ids[partition] = max(archived_ids.get(partition, 0), segment['max_id'])
+    
+    solved_problems = [
+        problem for problem in solved_problems
+        if problem['id'] > archived_ids.get(problem['solved_at'][:7], 0)
+    ]
+
+def archive_cold_data():
+    """Move records older than the cutoff from memory into cold segments"""
+    global solved_problems, last_archive_run
+    if ARCHIVE_AFTER_DAYS <= 0:
+        return 0
+    
+    last_archive_run = time.monotonic()
+    
+    cutoff = (datetime.now() - timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+    with data_lock:
+        drop_archived_problems()
+        cold = [problem for problem in solved_problems if problem['solved_at'] < cutoff]
+        if not cold:
+            return 0
+        
+        # One segment per month, keyed by the solved_at prefix (YYYY-MM)
+        partitions = {}
+        for problem in cold:
+            partitions.setdefault(problem['solved_at'][:7], []).append(problem)
+        for partition, records in sorted(partitions.items()):
+            write_segment(partition, records)
+        
+        # Segments are written before the hot file shrinks, so a crash cannot lose
+        # records; any left in both places are dropped by drop_archived_problems()
+        solved_problems = [problem for problem in solved_problems if problem['solved_at'] >= cutoff]
+        save_data()
+    
+    # Cached responses still list the archived records as recent
+    for user_id in {problem['user_id'] for problem in cold}:
+        invalidate_cache(user_id)
+    return len(cold)
+
+def maybe_archive_cold_data():
+    """Archive cold records if the last run is more than ARCHIVE_INTERVAL ago"""
+    if last_archive_run is not None and time.monotonic() - last_archive_run < ARCHIVE_INTERVAL:
+        return 0
+    return archive_cold_data()
+
+def read_user_records(segment, user_id):
+    """Read one user's records from a cold segment, decompressing only their block"""
+    entry = segment['users'][user_id]
+    with open(os.path.join(ARCHIVE_DIR, segment['file']), 'rb') as f:
+        f.seek(entry['offset'])
+        block = f.read(entry['length'])
+    return [json.loads(line) for line in gzip.decompress(block).decode('utf-8').splitlines()]
+
+def get_cold_segments(user_id, since=None):
+    """Get the cold segments holding records for user, newer than since if given"""
+    return [
+        segment for segment in cold_segments
+        if user_id in segment['users']
+        and (since is None or segment['users'][user_id]['max_solved_at'] >= since)
+    ]
+
+def get_cold_problems(user_id, since=None):
+    """Read a user's archived problems from the segments that reach back far enough"""
+    problems = []
+    for segment in get_cold_segments(user_id, since):
+        for problem in read_user_records(segment, user_id):
+            if since is None or problem['solved_at'] >= since:
+                problems.append(problem)
+    return problems
+
+def refresh_last_problem_id(max_id=None):
+    """Raise last_problem_id to max_id, or recompute it from everything loaded"""
+    global last_problem_id
+    if max_id is not None:
+        last_problem_id = max(last_problem_id, max_id)
+        return
+    last_problem_id = max(
+        [problem['id'] for problem in solved_problems]
+        + [segment['max_id'] for segment in cold_segments],
+        default=0
+    )
+
+def next_problem_id():
+    """Get the next problem id across hot and cold records (call with data_lock held)"""
+    global last_problem_id
+    last_problem_id += 1
+    return last_problem_id
+
+def parse_since(value):
+    """Normalize the optional since query parameter to an ISO timestamp"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).isoformat()
 
 def get_cache_key(user_id):
     """Generate Redis cache key for user"""
     return f"solved_problems:{user_id}"
 
+def get_cache_client(user_id):
+    """Get the Redis node that owns the user's cache entry, or None if it is down"""
+    name = cache_ring.get_node_name(user_id)
+    if name is None:
+        return None
+    return get_node_client(name)
+
 def get_from_cache(user_id):
     """Get user's solved problems from Redis cache"""
-    if not REDIS_AVAILABLE:
+    client = get_cache_client(user_id)
+    if client is None:
         return None
     
     try:
         cache_key = get_cache_key(user_id)
-        cached_data = redis_client.get(cache_key)
+        with timed_phase('cache_get'):
+            cached_data = client.get(cache_key)
         if cached_data:
-            return json.loads(cached_data)
+            with timed_phase('cache_deserialization'):
+                return json.loads(cached_data)
     except (redis.RedisError, json.JSONDecodeError) as e:
+        handle_node_error(user_id, e)
         print(f"Cache read error: {e}")
     
     return None
 
 def set_cache(user_id, data):
     """Store user's solved problems in Redis cache"""
-    if not REDIS_AVAILABLE:
+    client = get_cache_client(user_id)
+    if client is None:
         return False
     
     try:
         cache_key = get_cache_key(user_id)
-        redis_client.setex(
-            cache_key, 
-            CACHE_TTL, 
-            json.dumps(data, default=str)
-        )
+        with timed_phase('cache_serialization'):
+            payload = json.dumps(data, default=str)
+        with timed_phase('cache_set'):
+            client.setex(cache_key, CACHE_TTL, payload)
         return True
-    except (redis.RedisError, json.JSONEncodeError) as e:
+    except (redis.RedisError, TypeError, ValueError) as e:
+        handle_node_error(user_id, e)
         print(f"Cache write error: {e}")
         return False
 
 def invalidate_cache(user_id):
     """Remove user's data from cache when new problem is added"""
-    if not REDIS_AVAILABLE:
+    client = get_cache_client(user_id)
+    if client is None:
         return
     
     try:
         cache_key = get_cache_key(user_id)
-        redis_client.delete(cache_key)
+        with timed_phase('cache_invalidate'):
+            client.delete(cache_key)
     except redis.RedisError as e:
+        handle_node_error(user_id, e)
         print(f"Cache invalidation error: {e}")
 
 # Load existing data on startup
 load_data()
+load_cold_segments()
+drop_archived_problems()
 
 @app.route('/solve', methods=['POST'])
 def store_solved_problem():
@@ -128,27 +619,31 @@ def store_solved_problem():
                 'error': 'Missing required fields: user_id and problem_title'
             }), 400
         
-        # Create solved problem entry
-        solved_problem = {
-            'id': len(solved_problems) + 1,
-            'user_id': data['user_id'],
-            'problem_title': data['problem_title'],
-            'problem_url': data.get('problem_url', ''),
-            'difficulty': data.get('difficulty', ''),
-            'platform': data.get('platform', ''),
-            'notes': data.get('notes', ''),
-            'solved_at': datetime.now().isoformat()
-        }
-        
-        # Add to storage
-        solved_problems.append(solved_problem)
-        
-        # Save to file
-        save_data()
+        with data_lock:
+            # Create solved problem entry
+            solved_problem = {
+                'id': next_problem_id(),
+                'user_id': data['user_id'],
+                'problem_title': data['problem_title'],
+                'problem_url': data.get('problem_url', ''),
+                'difficulty': data.get('difficulty', ''),
+                'platform': data.get('platform', ''),
+                'notes': data.get('notes', ''),
+                'solved_at': datetime.now().isoformat()
+            }
+            
+            # Add to storage
+            solved_problems.append(solved_problem)
+            
+            # Save to file
+            save_data()
         
         # Invalidate cache for this user
         invalidate_cache(data['user_id'])
         
+        # Writes drive archiving, so it runs however the app is served
+        maybe_archive_cold_data()
+        
         return jsonify({
             'message': 'Problem solved successfully recorded!',
             'problem': solved_problem
@@ -162,46 +657,85 @@ def store_solved_problem():
 @app.route('/solves/<user_id>', methods=['GET'])
 def get_solved_problems(user_id):
     """
-    Get all solved problems for a specific user
+    Get solved problems for a specific user
     Returns the problems and total count with caching support
+    By default only recent (hot) problems are returned, the optional query
+    parameter "since" (ISO timestamp) reaches back into archived problems
     """
     try:
-        # First, try to get from cache
-        cached_data = get_from_cache(user_id)
-        if cached_data:
+        try:
+            since = parse_since(request.args.get('since'))
+        except ValueError:
             return jsonify({
-                'user_id': user_id,
-                'total_solved': cached_data['total_solved'],
-                'problems': cached_data['problems'],
-                'source': 'cache',
-                'cached_at': cached_data.get('cached_at')
-            }), 200
+                'error': 'Invalid since parameter, expected an ISO timestamp'
+            }), 400
+        
+        # First, try to get from cache (only the default window is cached)
+        cached_data = get_from_cache(user_id) if since is None else None
+        if cached_data:
+            with timed_phase('serialization'):
+                response = jsonify({
+                    'user_id': user_id,
+                    'total_solved': cached_data['total_solved'],
+                    'archived_solved': cached_data.get('archived_solved', 0),
+                    'since': None,
+                    'problems': cached_data['problems'],
+                    'source': 'cache',
+                    'cached_at': cached_data.get('cached_at')
+                })
+            return response, 200
         
         # If not in cache, fetch from data source
-        user_problems = [
-            problem for problem in solved_problems 
-            if problem['user_id'] == user_id
-        ]
+        with timed_phase('storage_scan'):
+            hot_problems = [
+                problem for problem in solved_problems 
+                if problem['user_id'] == user_id
+            ]
+        
+        # Archived problems are counted from the segment indexes; their records
+        # are only read when "since" reaches back into them
+        with timed_phase('cold_storage_scan'):
+            archived_solved = sum(
+                segment['users'][user_id]['range'][1]
+                for segment in get_cold_segments(user_id)
+            )
+            if since is None:
+                user_problems = hot_problems
+            else:
+                user_problems = [
+                    problem for problem in hot_problems
+                    if problem['solved_at'] >= since
+                ]
+                user_problems.extend(get_cold_problems(user_id, since))
         
         # Sort by solved_at timestamp (most recent first)
-        user_problems.sort(key=lambda x: x['solved_at'], reverse=True)
+        with timed_phase('sort'):
+            user_problems.sort(key=lambda x: x['solved_at'], reverse=True)
+        
+        total_solved = len(hot_problems) + archived_solved
         
         # Prepare response data
         response_data = {
-            'total_solved': len(user_problems),
+            'total_solved': total_solved,
+            'archived_solved': archived_solved,
             'problems': user_problems,
             'cached_at': datetime.now().isoformat()
         }
         
         # Store in cache for future requests
-        set_cache(user_id, response_data)
+        if since is None:
+            set_cache(user_id, response_data)
         
-        return jsonify({
-            'user_id': user_id,
-            'total_solved': len(user_problems),
-            'problems': user_problems,
-            'source': 'api'
-        }), 200
+        with timed_phase('serialization'):
+            response = jsonify({
+                'user_id': user_id,
+                'total_solved': total_solved,
+                'archived_solved': archived_solved,
+                'since': since,
+                'problems': user_problems,
+                'source': 'api'
+            })
+        return response, 200
         
     except Exception as e:
         return jsonify({
@@ -211,11 +745,15 @@ def get_solved_problems(user_id):
 @app.route('/solves', methods=['GET'])
 def get_all_solved_problems():
     """
-    Get all solved problems (bonus endpoint)
+    Get all recent solved problems (bonus endpoint)
+    Archived problems are only counted, not listed
     """
     try:
+        archived_problems = sum(segment['count'] for segment in cold_segments)
         return jsonify({
-            'total_problems': len(solved_problems),
+            'total_problems': len(solved_problems) + archived_problems,
+            'hot_problems': len(solved_problems),
+            'archived_problems': archived_problems,
             'problems': solved_problems
         }), 200
         
@@ -228,12 +766,22 @@ def get_all_solved_problems():
 def get_user_stats(user_id):
     """
     Get statistics for a specific user (bonus endpoint)
+    Optional query parameter "since" (ISO timestamp) limits how far back to count
     """
     try:
-        user_problems = [
-            problem for problem in solved_problems 
-            if problem['user_id'] == user_id
-        ]
+        try:
+            since = parse_since(request.args.get('since'))
+        except ValueError:
+            return jsonify({
+                'error': 'Invalid since parameter, expected an ISO timestamp'
+            }), 400
+        
+        with timed_phase('storage_scan'):
+            user_problems = [
+                problem for problem in solved_problems 
+                if problem['user_id'] == user_id
+                and (since is None or problem['solved_at'] >= since)
+            ]
         
         # Calculate statistics
         total_solved = len(user_problems)
@@ -249,6 +797,28 @@ def get_user_stats(user_id):
             difficulty_stats[difficulty] = difficulty_stats.get(difficulty, 0) + 1
             platform_stats[platform] = platform_stats.get(platform, 0) + 1
         
+        # Blocks entirely inside the range are counted from their index,
+        # only a user's block straddling "since" has to be decompressed
+        with timed_phase('cold_storage_scan'):
+            for segment in get_cold_segments(user_id, since):
+                entry = segment['users'][user_id]
+                if since is None or entry['min_solved_at'] >= since:
+                    total_solved += entry['range'][1]
+                    for difficulty, count in entry['difficulty'].items():
+                        difficulty_stats[difficulty] = difficulty_stats.get(difficulty, 0) + count
+                    for platform, count in entry['platform'].items():
+                        platform_stats[platform] = platform_stats.get(platform, 0) + count
+                    continue
+            
+                for problem in read_user_records(segment, user_id):
+                    if problem['solved_at'] < since:
+                        continue
+                    difficulty = problem.get('difficulty', 'Unknown')
+                    platform = problem.get('platform', 'Unknown')
+                    total_solved += 1
+                    difficulty_stats[difficulty] = difficulty_stats.get(difficulty, 0) + 1
+                    platform_stats[platform] = platform_stats.get(platform, 0) + 1
+        
         return jsonify({
             'user_id': user_id,
             'total_solved': total_solved,
@@ -266,14 +836,18 @@ def home():
     """
     API documentation endpoint
     """
+    refresh_redis_available()
+    now = time.monotonic()
     return jsonify({
         'message': 'Solved Problems Tracker API',
         'version': '1.0',
         'endpoints': {
             'POST /solve': 'Store a solved problem',
-            'GET /solves/<user_id>': 'Get all solved problems for a user (with Redis caching)',
-            'GET /solves': 'Get all solved problems',
+            'GET /solves/<user_id>': 'Get recent solved problems for a user (with Redis caching), ?since=<ISO timestamp> reaches into archived ones',
+            'GET /solves': 'Get all recent solved problems, archived ones are only counted',
             'GET /stats/<user_id>': 'Get user statistics',
+            'POST /archive': 'Move old records into cold storage segments',
+            'GET/POST /admin/profiling': 'View or change request profiling settings',
             'GET /cache/status': 'Check Redis cache status',
             'DELETE /cache/<user_id>': 'Clear cache for specific user',
             'GET /': 'API documentation'
@@ -281,8 +855,11 @@ def home():
         'caching': {
             'redis_available': REDIS_AVAILABLE,
             'cache_ttl': f'{CACHE_TTL} seconds',
-            'redis_host': REDIS_HOST,
-            'redis_port': REDIS_PORT
+            'redis_nodes': REDIS_NODES,
+            'active_nodes': [
+                name for name in cache_ring.nodes
+                if node_down_until.get(name, 0) <= now
+            ]
         },
         'example_usage': {
             'store_problem': {
@@ -304,6 +881,93 @@ def home():
         }
     })
 
+@app.route('/archive', methods=['POST'])
+def archive_old_problems():
+    """
+    Move records older than ARCHIVE_AFTER_DAYS into cold storage segments
+    Requires the X-Admin-Token header to match ADMIN_TOKEN
+    """
+    try:
+        error = check_admin_token()
+        if error:
+            return error
+        
+        archived = archive_cold_data()
+        
+        return jsonify({
+            'message': f'Archived {archived} problems',
+            'archived': archived,
+            'archive_after_days': ARCHIVE_AFTER_DAYS,
+            'segments': len(cold_segments)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error archiving problems: {str(e)}'
+        }), 500
+
+@app.route('/admin/profiling', methods=['GET', 'POST'])
+def profiling_settings():
+    """
+    View or change request timing and profiler settings
+    Changing settings requires the X-Admin-Token header to match ADMIN_TOKEN
+    Expected JSON payload for POST (all fields optional):
+    {
+        "timing_enabled": true,
+        "profiler_enabled": true,
+        "sample_rate": 0.05,
+        "slow_request_ms": 200
+    }
+    """
+    try:
+        # Reading the settings is open while ADMIN_TOKEN is unset, changing them is not
+        if request.method == 'POST' or ADMIN_TOKEN:
+            error = check_admin_token()
+            if error:
+                return error
+        
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            updates = {}
+            
+            for field in ('timing_enabled', 'profiler_enabled'):
+                if field in data:
+                    if not isinstance(data[field], bool):
+                        return jsonify({
+                            'error': f'{field} must be true or false'
+                        }), 400
+                    updates[field] = data[field]
+            
+            if 'sample_rate' in data:
+                sample_rate = data['sample_rate']
+                if (isinstance(sample_rate, bool) or not isinstance(sample_rate, (int, float))
+                        or not 0 <= sample_rate <= 1):
+                    return jsonify({
+                        'error': 'sample_rate must be a number between 0 and 1'
+                    }), 400
+                updates['sample_rate'] = float(sample_rate)
+            
+            if 'slow_request_ms' in data:
+                slow_request_ms = data['slow_request_ms']
+                if (isinstance(slow_request_ms, bool) or not isinstance(slow_request_ms, (int, float))
+                        or slow_request_ms < 0):
+                    return jsonify({
+                        'error': 'slow_request_ms must be a non-negative number'
+                    }), 400
+                updates['slow_request_ms'] = float(slow_request_ms)
+            
+            profiling_config.update(updates)
+        
+        return jsonify({
+            **profiling_config,
+            'slow_request_log': SLOW_REQUEST_LOG
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error updating profiling settings: {str(e)}'
+        }), 500
+
 # Additional cache management endpoints
 @app.route('/cache/status', methods=['GET'])
 def cache_status():
@@ -311,23 +975,63 @@ def cache_status():
     Check Redis cache status and statistics
     """
     try:
-        if not REDIS_AVAILABLE:
+        if not refresh_redis_available():
             return jsonify({
                 'redis_available': False,
                 'message': 'Redis is not available'
             }), 200
         
-        # Get Redis info
-        info = redis_client.info()
+        # Get Redis info from every node and merge the totals
+        nodes = []
+        for name in cache_ring.nodes:
+            # Nodes that are backing off are reported without contacting them
+            client = get_node_client(name)
+            if client is None:
+                nodes.append({
+                    'node': name,
+                    'available': False,
+                    'retry_in_seconds': round(max(node_down_until[name] - time.monotonic(), 0), 1)
+                })
+                continue
+            
+            try:
+                info = client.info()
+                nodes.append({
+                    'node': name,
+                    'available': True,
+                    'redis_version': info.get('redis_version'),
+                    'connected_clients': info.get('connected_clients', 0),
+                    'used_memory': info.get('used_memory', 0),
+                    'used_memory_human': info.get('used_memory_human'),
+                    'total_keys': client.dbsize(),
+                    'uptime_in_seconds': info.get('uptime_in_seconds')
+                })
+            except redis.RedisError as e:
+                if isinstance(e, (redis.ConnectionError, redis.TimeoutError)):
+                    mark_node_down(name, e)
+                nodes.append({
+                    'node': name,
+                    'available': False,
+                    'error': str(e)
+                })
+        
+        available_nodes = [node for node in nodes if node['available']]
         
         return jsonify({
-            'redis_available': True,
-            'redis_version': info.get('redis_version'),
-            'connected_clients': info.get('connected_clients'),
-            'used_memory_human': info.get('used_memory_human'),
-            'total_keys': redis_client.dbsize(),
+            'redis_available': bool(available_nodes),
+            'redis_version': available_nodes[0]['redis_version'] if available_nodes else None,
+            'connected_clients': sum(node['connected_clients'] for node in available_nodes),
+            'used_memory': sum(node['used_memory'] for node in available_nodes),
+            'total_keys': sum(node['total_keys'] for node in available_nodes),
             'cache_ttl': CACHE_TTL,
-            'uptime_in_seconds': info.get('uptime_in_seconds')
+            'uptime_in_seconds': min(
+                (node['uptime_in_seconds'] for node in available_nodes
+                 if node['uptime_in_seconds'] is not None),
+                default=None
+            ),
+            'node_count': len(nodes),
+            'available_node_count': len(available_nodes),
+            'nodes': nodes
         }), 200
         
     except Exception as e:
@@ -341,17 +1045,23 @@ def clear_user_cache(user_id):
     Clear cache for a specific user
     """
     try:
-        if not REDIS_AVAILABLE:
+        client = get_cache_client(user_id) if refresh_redis_available() else None
+        if client is None:
             return jsonify({
                 'message': 'Redis is not available, no cache to clear'
             }), 200
         
         cache_key = get_cache_key(user_id)
-        deleted = redis_client.delete(cache_key)
+        try:
+            deleted = client.delete(cache_key)
+        except redis.RedisError as e:
+            handle_node_error(user_id, e)
+            raise
         
         return jsonify({
             'message': f'Cache cleared for user: {user_id}',
-            'keys_deleted': deleted
+            'keys_deleted': deleted,
+            'node': cache_ring.get_node_name(user_id)
         }), 200
         
     except Exception as e:
@@ -360,4 +1070,5 @@ def clear_user_cache(user_id):
         }), 500
 
 if __name__ == '__main__':
+    archive_cold_data()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for hot/cold tiered storage
+Runs against the app in a temporary directory, no running server needed
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import app
+
+
+def make_problem(problem_id, user_id, days_ago, difficulty='Easy'):
+    return {
+        'id': problem_id,
+        'user_id': user_id,
+        'problem_title': f'Problem {problem_id}',
+        'problem_url': '',
+        'difficulty': difficulty,
+        'platform': 'LeetCode',
+        'notes': '',
+        'solved_at': (datetime.now() - timedelta(days=days_ago)).isoformat()
+    }
+
+
+def test_archive():
+    print("🧪 Testing Hot/Cold Tiered Storage")
+    print("=" * 50)
+
+    # Module state this test replaces, put back afterwards so test order does not matter
+    saved = {
+        name: getattr(app, name)
+        for name in (
+            'DATA_FILE', 'ARCHIVE_DIR', 'ARCHIVE_AFTER_DAYS', 'ADMIN_TOKEN',
+            'cache_ring', 'node_down_until', 'REDIS_AVAILABLE', 'solved_problems',
+            'cold_segments', 'last_problem_id', 'last_archive_run'
+        )
+    }
+    try:
+        workdir = tempfile.mkdtemp()
+        app.DATA_FILE = os.path.join(workdir, 'solved_problems.json')
+        app.ARCHIVE_DIR = os.path.join(workdir, 'archive')
+        app.ARCHIVE_AFTER_DAYS = 30
+        # No Redis nodes, so nothing is cached
+        app.cache_ring = app.HashRing()
+        app.node_down_until = {}
+        app.cold_segments = []
+        app.solved_problems = [
+            make_problem(1, 'alice', 200, 'Hard'),
+            make_problem(2, 'alice', 100),
+            make_problem(3, 'bob', 100),
+            make_problem(4, 'alice', 5, 'Medium'),
+        ]
+        client = app.app.test_client()
+
+        # Test 1: Old records move into compressed segments
+        print("1️⃣ Archiving records older than the cutoff")
+        archived = app.archive_cold_data()
+        assert archived == 3
+        assert [problem['id'] for problem in app.solved_problems] == [4]
+        with open(app.DATA_FILE) as f:
+            assert len(json.load(f)) == 1
+        files = sorted(os.listdir(app.ARCHIVE_DIR))
+        print(f"   Segment files: {files}")
+        assert all(name.endswith(('.jsonl.gz', '.index.json')) for name in files)
+        print("✅ Cold records archived and removed from memory")
+        print()
+
+        # Test 1b: The index holds a block per user, not a position per record
+        print("1️⃣b Reading one user's block from a segment")
+        bob_segment = app.get_cold_segments('bob')[0]
+        entry = bob_segment['users']['bob']
+        assert entry['range'][1] == 1 and 'positions' not in entry
+        assert [problem['id'] for problem in app.read_user_records(bob_segment, 'bob')] == [3]
+        print("✅ Only the requested user's records were decompressed")
+        print()
+
+        # Test 2: Recent queries never touch cold segments
+        print("2️⃣ Querying only recent history")
+        reads = []
+        read_user_records = app.read_user_records
+        app.read_user_records = lambda segment, user_id: reads.append(segment) or read_user_records(segment, user_id)
+        try:
+            since = (datetime.now() - timedelta(days=10)).isoformat()
+            data = client.get(f'/solves/alice?since={since}').get_json()
+            assert [problem['id'] for problem in data['problems']] == [4]
+            data = client.get('/solves/alice').get_json()
+            assert [problem['id'] for problem in data['problems']] == [4]
+            assert data['total_solved'] == 3 and data['archived_solved'] == 2
+            data = client.get('/solves').get_json()
+            assert data['total_problems'] == 4 and data['hot_problems'] == 1
+            assert data['archived_problems'] == 3 and len(data['problems']) == 1
+            assert reads == []
+        finally:
+            app.read_user_records = read_user_records
+        print("✅ Recent and default queries read no cold segment")
+        print()
+
+        # Test 3: Full history reads the cold segments on demand
+        print("3️⃣ Querying the full history")
+        data = client.get('/solves/alice?since=2000-01-01').get_json()
+        assert [problem['id'] for problem in data['problems']] == [4, 2, 1]
+        stats = client.get('/stats/alice').get_json()
+        assert stats['total_solved'] == 3
+        assert stats['difficulty_breakdown'] == {'Hard': 1, 'Easy': 1, 'Medium': 1}
+        print(f"   Stats: {stats['difficulty_breakdown']}")
+        print("✅ Archived records included")
+        print()
+
+        # Test 4: Segments reload from disk and ids keep increasing
+        print("4️⃣ Reloading segment indexes")
+        app.load_cold_segments()
+        assert len(app.cold_segments) == len(files) // 2
+        assert app.next_problem_id() == 5
+        print("✅ Indexes reloaded, next id is 5")
+        print()
+
+        # Test 5: Records left in the hot file by a crash are not duplicated
+        print("5️⃣ Recovering from a crash between segment write and save")
+        app.solved_problems = [
+            make_problem(5, 'alice', 150),
+            make_problem(6, 'alice', 2),
+        ]
+        app.save_data()
+        with open(app.DATA_FILE) as f:
+            before_archive = f.read()
+        app.archive_cold_data()
+        # Simulate the crash: the hot file still holds the archived record
+        with open(app.DATA_FILE, 'w') as f:
+            f.write(before_archive)
+        app.load_data()
+        app.load_cold_segments()
+        app.drop_archived_problems()
+        assert [problem['id'] for problem in app.solved_problems] == [6]
+        data = client.get('/solves/alice?since=2000-01-01').get_json()
+        assert sorted(problem['id'] for problem in data['problems']) == [1, 2, 5, 6]
+        assert client.get('/stats/alice').get_json()['total_solved'] == 4
+        print("✅ Archived records served once")
+        print()
+
+        # Test 6: An unreadable index never gets its segment overwritten
+        print("6️⃣ Archiving next to a segment with an unreadable index")
+        segment = app.cold_segments[0]
+        index_path = os.path.join(app.ARCHIVE_DIR, segment['file'].replace('.jsonl.gz', '.index.json'))
+        with open(index_path, 'w') as f:
+            f.write('not json')
+        app.load_cold_segments()
+        existing = set(os.listdir(app.ARCHIVE_DIR))
+        index = app.write_segment(segment['partition'], [make_problem(7, 'carol', 150)])
+        assert index['file'] not in existing
+        print(f"   New segment: {index['file']}")
+        print("✅ Existing segment kept")
+        print()
+
+        # Test 7: POST /solve archives at most once per interval
+        print("7️⃣ Archiving triggered by writes")
+        app.solved_problems = [make_problem(8, 'dave', 120)]
+        app.last_archive_run = None
+        client.post('/solve', json={'user_id': 'dave', 'problem_title': 'Fresh'})
+        assert [problem['user_id'] for problem in app.solved_problems] == ['dave']
+        assert app.solved_problems[0]['problem_title'] == 'Fresh'
+        app.solved_problems.append(make_problem(10, 'dave', 120))
+        client.post('/solve', json={'user_id': 'dave', 'problem_title': 'Fresh again'})
+        assert any(problem['id'] == 10 for problem in app.solved_problems)
+        print("✅ Old records archived by the first write, not again within the interval")
+        print()
+
+        # Test 8: POST /archive needs the admin token
+        print("8️⃣ Protecting POST /archive")
+        app.ADMIN_TOKEN = None
+        assert client.post('/archive').status_code == 403
+        app.ADMIN_TOKEN = 'secret'
+        assert client.post('/archive').status_code == 403
+        response = client.post('/archive', headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 200 and response.get_json()['archived'] == 1
+        print("✅ Archive endpoint requires ADMIN_TOKEN")
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+
+    print("\n" + "=" * 50)
+    print("🎉 Tiered Storage Tests Complete!")
+
+
+if __name__ == '__main__':
+    test_archive()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for request profiling and the slow-request log
+Runs against the app in a temporary directory, no running server needed
+"""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+import app
+
+
+def read_log(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_profiling():
+    print("🧪 Testing Request Profiling")
+    print("=" * 50)
+
+    # Module state this test replaces, put back afterwards so test order does not matter
+    saved = {
+        name: getattr(app, name)
+        for name in (
+            'DATA_FILE', 'ARCHIVE_DIR', 'ADMIN_TOKEN', 'cache_ring', 'node_down_until',
+            'REDIS_AVAILABLE', 'solved_problems', 'cold_segments', 'last_problem_id',
+            'last_archive_run'
+        )
+    }
+    saved_config = dict(app.profiling_config)
+    saved_handlers = list(app.slow_request_logger.handlers)
+    try:
+        workdir = tempfile.mkdtemp()
+        log_path = os.path.join(workdir, 'slow_requests.log')
+        app.DATA_FILE = os.path.join(workdir, 'solved_problems.json')
+        app.ARCHIVE_DIR = os.path.join(workdir, 'archive')
+        # No Redis nodes, so nothing is cached
+        app.cache_ring = app.HashRing()
+        app.node_down_until = {}
+        app.cold_segments = []
+        app.solved_problems = [
+            {
+                'id': i,
+                'user_id': 'alice' if i % 2 else 'bob',
+                'problem_title': f'Problem {i}',
+                'difficulty': 'Easy',
+                'platform': 'LeetCode',
+                'solved_at': datetime.now().isoformat()
+            }
+            for i in range(1, 2001)
+        ]
+        app.refresh_last_problem_id()
+        for handler in saved_handlers:
+            app.slow_request_logger.removeHandler(handler)
+        app.slow_request_logger.addHandler(logging.FileHandler(log_path))
+        client = app.app.test_client()
+
+        # Test 1: Instrumentation is off by default
+        print("1️⃣ Checking instrumentation is opt-in")
+        response = client.get('/solves/alice')
+        assert 'Server-Timing' not in response.headers
+        print("✅ No timing without opting in")
+        print()
+
+        # Test 2: Enable timing and the profiler through the admin endpoint
+        print("2️⃣ Enabling profiling (POST /admin/profiling)")
+        app.ADMIN_TOKEN = None
+        response = client.post('/admin/profiling', json={'timing_enabled': True})
+        assert response.status_code == 403
+        assert not app.profiling_config['timing_enabled']
+        app.ADMIN_TOKEN = 'secret'
+        admin = {'X-Admin-Token': 'secret'}
+        assert client.post('/admin/profiling', json={'timing_enabled': True}).status_code == 403
+        response = client.post('/admin/profiling', headers=admin, json={
+            'timing_enabled': True,
+            'profiler_enabled': True,
+            'sample_rate': 1,
+            'slow_request_ms': 0
+        })
+        assert response.status_code == 200
+        assert response.get_json()['sample_rate'] == 1.0
+        bad = client.post('/admin/profiling', headers=admin, json={'sample_rate': 2})
+        assert bad.status_code == 400
+        print("✅ Settings need the admin token, invalid values rejected")
+        print()
+
+        # Test 3: Slow requests are logged with a phase breakdown and profile
+        print("3️⃣ Checking the slow-request log")
+        response = client.get('/solves/alice')
+        assert 'storage_scan' in response.headers['Server-Timing']
+        client.post('/solve', json={'user_id': 'alice', 'problem_title': 'Timed'})
+        solves, solve = read_log(log_path)[-2:]
+        assert solves['path'] == '/solves/alice' and solve['path'] == '/solve'
+        print(f"   Phases: {solves['phases']}")
+        assert {'storage_scan', 'sort', 'serialization'} <= set(solves['phases'])
+        assert 'persistence' in solve['phases']
+        assert solves['profile'] and 'cumulative_ms' in solves['profile'][0]
+        print("✅ Phase breakdown and profile recorded")
+        print()
+
+        # Test 4: Only requests over the threshold are logged
+        print("4️⃣ Raising the slow-request threshold")
+        client.post('/admin/profiling', headers=admin, json={'slow_request_ms': 60000})
+        logged = len(read_log(log_path))
+        client.get('/stats/alice')
+        assert len(read_log(log_path)) == logged
+        print("✅ Fast requests are not logged")
+
+        client.post('/admin/profiling', headers=admin, json={'timing_enabled': False, 'profiler_enabled': False})
+        assert not app.profiler_lock.locked()
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+        app.profiling_config.update(saved_config)
+        for handler in list(app.slow_request_logger.handlers):
+            app.slow_request_logger.removeHandler(handler)
+            handler.close()
+        for handler in saved_handlers:
+            app.slow_request_logger.addHandler(handler)
+
+    print("\n" + "=" * 50)
+    print("🎉 Profiling Tests Complete!")
+
+
+if __name__ == '__main__':
+    test_profiling()
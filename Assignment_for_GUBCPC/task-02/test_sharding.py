@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test script for consistent-hash sharding of the Redis cache
+Uses in-memory Redis stand-ins, no running server or Redis needed
+"""
+
+import app
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for a Redis node"""
+
+    def __init__(self, name):
+        self.name = name
+        self.store = {}
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def delete(self, key):
+        return 1 if self.store.pop(key, None) is not None else 0
+
+    def dbsize(self):
+        return len(self.store)
+
+    def info(self):
+        return {
+            'redis_version': 'fake',
+            'connected_clients': 1,
+            'used_memory': 1024,
+            'used_memory_human': '1.00K',
+            'uptime_in_seconds': 10
+        }
+
+
+class UnreachableRedis(FakeRedis):
+    """Stand-in for a Redis node that is down, counting connection attempts"""
+
+    calls = 0
+
+    def _fail(self, *args, **kwargs):
+        self.calls += 1
+        raise app.redis.ConnectionError(f"{self.name} is down")
+
+    ping = get = setex = delete = dbsize = info = _fail
+
+
+def build_ring(names):
+    ring = app.HashRing()
+    for name in names:
+        ring.add_node(name, FakeRedis(name))
+    return ring
+
+
+def test_sharding():
+    print("🧪 Testing Consistent-Hash Cache Sharding")
+    print("=" * 50)
+
+    # Module state this test replaces, put back afterwards so test order does not matter
+    saved = {name: getattr(app, name) for name in ('cache_ring', 'node_down_until', 'REDIS_AVAILABLE')}
+    app.node_down_until = {}
+    try:
+        users = [f"user_{i}" for i in range(5000)]
+        names = ['node-a:6379', 'node-b:6379', 'node-c:6379']
+
+        # Test 1: Keys are spread over every node
+        print("1️⃣ Testing key distribution across nodes")
+        ring = build_ring(names)
+        counts = {name: 0 for name in names}
+        for user in users:
+            counts[ring.get_node_name(user)] += 1
+        print(f"   Distribution: {counts}")
+        expected = len(users) / len(names)
+        assert all(abs(count - expected) / expected < 0.25 for count in counts.values())
+        print("✅ Keys are balanced across nodes")
+        print()
+
+        # Test 2: Adding a node only moves keys onto the new node
+        print("2️⃣ Testing remapping when a node is added")
+        before = {user: ring.get_node_name(user) for user in users}
+        ring.add_node('node-d:6379', FakeRedis('node-d:6379'))
+        moved = [user for user in users if ring.get_node_name(user) != before[user]]
+        assert all(ring.get_node_name(user) == 'node-d:6379' for user in moved)
+        print(f"   Moved keys: {len(moved)} of {len(users)}")
+        assert len(moved) / len(users) < 0.4
+        print("✅ Only keys taken over by the new node were remapped")
+        print()
+
+        # Test 3: Removing a node only moves that node's keys
+        print("3️⃣ Testing remapping when a node is removed")
+        before = {user: ring.get_node_name(user) for user in users}
+        ring.remove_node('node-b:6379')
+        moved = [user for user in users if ring.get_node_name(user) != before[user]]
+        assert all(before[user] == 'node-b:6379' for user in moved)
+        print(f"   Moved keys: {len(moved)} of {len(users)}")
+        print("✅ Only keys of the removed node were remapped")
+        print()
+
+        # Test 4: Cache helpers and status endpoint use the ring
+        print("4️⃣ Testing cache helpers and /cache/status with stand-in nodes")
+        app.cache_ring = build_ring(names)
+        app.node_down_until.clear()
+        for user in users[:30]:
+            assert app.set_cache(user, {'total_solved': 0, 'problems': []})
+            owner = app.cache_ring.get_node(user)
+            assert app.get_cache_key(user) in owner.store
+            assert app.get_from_cache(user) == {'total_solved': 0, 'problems': []}
+        app.invalidate_cache(users[0])
+        assert app.get_from_cache(users[0]) is None
+
+        response = app.app.test_client().get('/cache/status')
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['node_count'] == len(names)
+        assert data['total_keys'] == 29
+        assert data['total_keys'] == sum(node['total_keys'] for node in data['nodes'])
+        print(f"   Total keys: {data['total_keys']} across {data['node_count']} nodes")
+        print("✅ Per-node stats merged correctly")
+        print()
+
+        # Test 5: A node that is down keeps its share of the keys
+        print("5️⃣ Testing an unreachable node stays on the ring")
+        app.cache_ring = build_ring(names[:2])
+        down_node = UnreachableRedis(names[2])
+        app.cache_ring.add_node(names[2], down_node)
+        owned = [user for user in users if app.cache_ring.get_node_name(user) == names[2]]
+        print(f"   Keys owned by the down node: {len(owned)} of {len(users)}")
+        assert len(owned) / len(users) > 0.2
+        user = owned[0]
+        assert not app.set_cache(user, {'total_solved': 0, 'problems': []})
+        assert app.get_from_cache(user) is None
+        app.invalidate_cache(user)
+        data = app.app.test_client().get('/cache/status').get_json()
+        assert data['node_count'] == 3 and data['available_node_count'] == 2
+        print("✅ Down node keeps its keys and only causes cache misses")
+        print()
+
+        # Test 6: A down node is not contacted again until its backoff is over
+        print("6️⃣ Testing the down node is skipped during its backoff")
+        assert down_node.calls == 1
+        for _ in range(10):
+            assert app.get_from_cache(user) is None
+        assert down_node.calls == 1
+        assert app.REDIS_AVAILABLE
+        home = app.app.test_client().get('/').get_json()
+        assert names[2] not in home['caching']['active_nodes']
+
+        # Once the backoff expires a single ping decides whether it is back
+        app.node_down_until[names[2]] = 0
+        assert app.get_from_cache(user) is None
+        assert down_node.calls == 2
+        assert app.node_down_until[names[2]] > 0
+        print("✅ No connection attempts within the backoff")
+        print()
+
+        # Test 7: A ring without points is rejected, and no owner is a cache miss
+        print("7️⃣ Testing invalid virtual node counts and unmapped keys")
+        try:
+            app.HashRing(virtual_nodes=0)
+            assert False, "HashRing accepted 0 virtual nodes"
+        except ValueError:
+            pass
+        app.cache_ring = app.HashRing()
+        app.cache_ring.nodes[names[0]] = FakeRedis(names[0])
+        assert app.get_cache_client(users[0]) is None
+        assert app.get_from_cache(users[0]) is None
+        assert not app.set_cache(users[0], {'total_solved': 0, 'problems': []})
+        app.invalidate_cache(users[0])
+        print("✅ Unmapped keys are cache misses")
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+
+    print("\n" + "=" * 50)
+    print("🎉 Sharding Tests Complete!")
+
+
+if __name__ == '__main__':
+    test_sharding()